@@ -1,24 +1,53 @@
+import datetime
+import logging
+import os
+import threading
+from bisect import bisect_right
+from collections import namedtuple
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
 import yfinance as yf
 
-def fetch_ticker_data(ticker: str, period: str):
+try:
+    from numba import njit
+except ImportError:  # numba es opcional: sin él se usa Python puro
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+log = logging.getLogger(__name__)
+
+# Caché de objetos Ticker para no reconstruirlos en cada llamada
+_ticker_cache: dict[str, yf.Ticker] = {}
+
+
+def get_ticker(ticker: str):
     """
-    Obtiene los datos históricos de un ticker.
+    Devuelve el objeto yf.Ticker de un símbolo, reutilizándolo si ya existe.
     
     Args:
         ticker (str): Símbolo de la acción (e.g., "AAPL").
-        period (str): El periodo de tiempo para los datos históricos (e.g., "1y").
     
     Returns:
-        tuple: (datos históricos, información general del ticker)
+        yf.Ticker: Objeto Ticker de yfinance.
     """
-    try:
-        stock = yf.Ticker(ticker)
-        data = stock.history(period=period)
-        info = stock.info
-        return data, info
-    except Exception as e:
-        print(f"Error al obtener datos para {ticker}: {e}")
-        return None, None
+    stock = _ticker_cache.get(ticker)
+    if stock is None:
+        stock = _ticker_cache[ticker] = yf.Ticker(ticker)
+    return stock
+
+
+# Escalas para format_large_numbers: (divisor, sufijo, formato), de menor a mayor
+_SCALES = (
+    (1, "", ".2f"),
+    (1_000, "K", ".1f"),  # Miles
+    (1_000_000, "M", ".1f"),  # Millones
+    (1_000_000_000, "B", ".1f"),  # Billones
+)
+# Valor a partir del cual se usa cada escala (salvo la primera)
+_SCALE_BOUNDS = tuple(scale for scale, _, _ in _SCALES[1:])
 
 
 def format_large_numbers(value):
@@ -36,74 +65,385 @@ def format_large_numbers(value):
     
     try:
         value = float(value)
-        
-        if value >= 1_000_000_000:  # Billones
-            return f"{value / 1_000_000_000:.1f}B"
-        elif value >= 1_000_000:  # Millones
-            return f"{value / 1_000_000:.1f}M"
-        elif value >= 1_000:  # Miles
-            return f"{value / 1_000:.1f}K"
-        else:
-            return f"{value:.2f}"
     except ValueError:
         return "Dato no disponible"
+    if value != value:  # NaN
+        return "Dato no disponible"
+    
+    scale, suffix, spec = _SCALES[bisect_right(_SCALE_BOUNDS, value)]
+    return f"{value / scale:{spec}}{suffix}"
 
 
-def fetch_fundamental_data(ticker: str):
+def format_large_numbers_vec(values: pd.Series) -> pd.Series:
     """
-    Obtiene los datos fundamentales para un ticker, incluyendo métricas clave de Peter Lynch.
+    Versión vectorizada de format_large_numbers para una serie completa.
+    
+    Args:
+        values (pd.Series): Los valores numéricos a formatear.
+    
+    Returns:
+        pd.Series: Los valores formateados, con el mismo índice.
+    """
+    values = values.astype(float)
+    # np.select se queda con la primera condición cierta, así que se recorren de mayor a menor
+    base_scale, base_suffix, base_spec = _SCALES[0]
+    tiers = _SCALES[:0:-1]
+    conditions = [values >= scale for scale, _, _ in tiers]
+    scaled = np.select(conditions, [values / scale for scale, _, _ in tiers], default=values / base_scale)
+    suffixes = np.select(conditions, [suffix for _, suffix, _ in tiers], default=base_suffix)
+    specs = np.select(conditions, [spec for _, _, spec in tiers], default=base_spec)
+    formatted = pd.Series(
+        [f"{v:{spec}}{suffix}" for v, suffix, spec in zip(scaled, suffixes, specs)],
+        index=values.index,
+    )
+    return formatted.where(values.notna(), "Dato no disponible")
+
+
+def format_percentage(value):
+    """
+    Convierte una fracción (e.g., 0.0052) en un porcentaje legible.
+    
+    Args:
+        value (float): La fracción a convertir.
+    
+    Returns:
+        str: El valor en porcentaje o "Dato no disponible".
+    """
+    if value is None:
+        return "Dato no disponible"
+    return f"{value * 100}%"
+
+
+def _metric(label, key=None, formatter=None):
+    # label: etiqueta a mostrar; key: campo de stock.info; formatter: función de formato opcional
+    return field(metadata={"label": label, "key": key, "formatter": formatter})
+
+
+@dataclass(slots=True)
+class Fundamentals:
+    """
+    Métricas clave para el análisis fundamental de un ticker.
+    
+    Cada valor es el dato ya formateado o "Dato no disponible".
+    """
+    pe_ratio: float | str = _metric("P/E Ratio", "trailingPE")
+    pb_ratio: float | str = _metric("P/B Ratio", "priceToBook")
+    dividend_yield: str = _metric("Dividend Yield", "dividendYield", format_percentage)
+    roe: float | str = _metric("ROE", "returnOnEquity")
+    debt_to_equity: float | str = _metric("Debt to Equity", "debtToEquity")
+    beta: float | str = _metric("Beta", "beta")
+    revenue_growth: float | str = _metric("Revenue Growth", "revenueGrowth")
+    free_cash_flow: str = _metric("Free Cash Flow", "freeCashflow", format_large_numbers)
+    total_debt: str = _metric("Total Debt", "totalDebt", format_large_numbers)
+    long_term_debt: str = _metric("Long-Term Debt", "longTermDebt", format_large_numbers)
+    operating_income: str = _metric("Operating Income", "operatingIncome", format_large_numbers)
+    net_income: str = _metric("Net Income", "netIncomeToCommon", format_large_numbers)
+    eps_growth_5y: float | str = _metric("EPS Growth (5Y)", "earningsQuarterlyGrowth")
+    eps_growth_next_5y: float | str = _metric("EPS Growth (Next 5Y)", "earningsGrowth")
+    debt_comparison: dict = _metric("Debt Comparison")
+
+    def items(self):
+        """
+        Recorre las métricas para mostrarlas.
+        
+        Returns:
+            iterator: Pares (etiqueta, valor) en el orden de presentación.
+        """
+        for metric in fields(self):
+            yield metric.metadata["label"], getattr(self, metric.name)
+
+
+# Métricas de Fundamentals que se leen directamente de stock.info
+_FUND_METRICS = tuple(metric for metric in fields(Fundamentals) if metric.metadata["key"] is not None)
+
+# Campos de stock.info que se muestran en la información del ticker
+_DISPLAY_FIELDS = ("exchange", "symbol", "longName", "sector", "industry", "country", "currency")
+
+# Campos de stock.info que usa el análisis
+FIELDS = tuple(metric.metadata["key"] for metric in _FUND_METRICS) + _DISPLAY_FIELDS
+TickerInfo = namedtuple("TickerInfo", FIELDS)
+
+
+# Un cerrojo por ticker evita descargar dos veces la misma información sin
+# bloquear las descargas de otros tickers; _info_locks_guard protege el diccionario
+_info_locks: dict[str, threading.Lock] = {}
+_info_locks_guard = threading.Lock()
+
+
+@lru_cache(maxsize=128)
+def _fetch_info(ticker: str):
+    # Quedarse solo con los campos necesarios para no mantener en caché el dict completo
+    info = get_ticker(ticker).info
+    return TickerInfo(*(info.get(key) for key in FIELDS))
+
+
+def _get_info(ticker: str):
+    """
+    Obtiene (una sola vez por ticker) la información general de Yahoo Finance.
     
     Args:
         ticker (str): Símbolo de la acción (e.g., "AAPL").
     
     Returns:
-        dict: Métricas clave para el análisis fundamental.
+        TickerInfo: Campos de la información general que usa el análisis.
+    """
+    with _info_locks_guard:
+        lock = _info_locks.setdefault(ticker, threading.Lock())
+    with lock:
+        return _fetch_info(ticker)
+
+
+# Directorio de la caché en disco para los DataFrames descargados
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+
+def _load_cached_df(key: str):
+    """
+    Lee un DataFrame de la caché en disco si se generó hoy.
+    
+    Args:
+        key (str): Clave del fichero en caché (e.g., "AAPL_1y_history").
+    
+    Returns:
+        pd.DataFrame: Los datos en caché, o None si no hay datos válidos.
     """
+    path = os.path.join(CACHE_DIR, f"{key}.pkl")
+    # La caché es opcional: un fichero ilegible o truncado se trata como si no existiera
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        # Función auxiliar para manejar el acceso a datos que pueden no estar disponibles
-        def safe_get(data, field, default="Dato no disponible"):
-            return data.get(field, default) if field in data else default
-        
-        dividend_yield = safe_get(info, "dividendYield")
-        if dividend_yield != "Dato no disponible" and dividend_yield is not None:
-            dividend_yield = dividend_yield * 100  # Convertir a porcentaje
-        
-        # Métricas fundamentales
-        fundamental_data = {
-            "P/E Ratio": safe_get(info, "trailingPE"),
-            "P/B Ratio": safe_get(info, "priceToBook"),
-            "Dividend Yield": f"{dividend_yield}%" if dividend_yield != "Dato no disponible" else "Dato no disponible",
-            "ROE": safe_get(info, "returnOnEquity"),
-            "Debt to Equity": safe_get(info, "debtToEquity"),
-            "Beta": safe_get(info, "beta"),
-            "Revenue Growth": safe_get(info, "revenueGrowth"),
-            "Free Cash Flow": format_large_numbers(safe_get(info, "freeCashflow")),
-            "Total Debt": format_large_numbers(safe_get(info, "totalDebt")),
-            "Long-Term Debt": format_large_numbers(safe_get(info, "longTermDebt")),
-            "Operating Income": format_large_numbers(safe_get(info, "operatingIncome")),
-            "Net Income": format_large_numbers(safe_get(info, "netIncomeToCommon")),
-            "EPS Growth (5Y)": safe_get(info, "earningsQuarterlyGrowth"),
-            "EPS Growth (Next 5Y)": safe_get(info, "earningsGrowth"),
-        }
-
-        # Comparar deuda de años anteriores, si la información está disponible
-        debt_comparison = {
-            "Deuda Anterior": format_large_numbers(safe_get(info, "debtToEquity")),
-        }
-        
-        # Añadir crecimiento de la deuda si los datos son accesibles
-        if safe_get(info, "totalDebt", None) and safe_get(info, "debtToEquity", None):
-            debt_comparison["Cambio Deuda"] = format_large_numbers(float(safe_get(info, "totalDebt", 0)) / float(safe_get(info, "debtToEquity", 1)))
+        if os.path.exists(path):
+            modified = datetime.date.fromtimestamp(os.path.getmtime(path))
+            if modified == datetime.date.today():
+                return pd.read_pickle(path)
+    except Exception as e:
+        log.warning("No se pudo leer la caché %s: %s", path, e)
+    return None
+
 
-        fundamental_data["Debt Comparison"] = debt_comparison
+def _save_cached_df(key: str, df):
+    """
+    Guarda un DataFrame en la caché en disco, si no está vacío.
+    
+    Se escribe en un fichero temporal que luego se renombra, para que una escritura
+    interrumpida nunca deje un fichero a medias. Si no se puede escribir, los datos
+    se siguen usando sin caché.
+    
+    Args:
+        key (str): Clave del fichero en caché (e.g., "AAPL_1y_history").
+        df (pd.DataFrame): Los datos a guardar.
+    """
+    if df is None or df.empty:
+        return
+    path = os.path.join(CACHE_DIR, f"{key}.pkl")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        log.warning("No se pudo guardar la caché %s: %s", path, e)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _cached_df(key: str, fn):
+    """
+    Devuelve un DataFrame desde la caché en disco o lo descarga y lo guarda.
+    
+    La caché solo es válida durante el día en que se generó.
+    
+    Args:
+        key (str): Clave del fichero en caché (e.g., "AAPL_1y_history").
+        fn (callable): Función que descarga el DataFrame si no está en caché.
+    
+    Returns:
+        pd.DataFrame: Los datos solicitados.
+    """
+    df = _load_cached_df(key)
+    if df is not None:
+        return df
+
+    df = fn()
+    _save_cached_df(key, df)
+    return df
+
+
+def fetch_ticker_data(ticker: str, period: str):
+    """
+    Obtiene los datos históricos de un ticker.
+    
+    Args:
+        ticker (str): Símbolo de la acción (e.g., "AAPL").
+        period (str): El periodo de tiempo para los datos históricos (e.g., "1y").
+    
+    Returns:
+        tuple: (datos históricos, información general del ticker)
+    """
+    try:
+        stock = get_ticker(ticker)
+        data = _cached_df(f"{ticker}_{period}_history", lambda: stock.history(period=period))
+        info = _get_info(ticker)
+        return data, info
+    except Exception as e:
+        log.warning("Error al obtener datos para %s: %s", ticker, e)
+        return None, None
+
+
+# Número máximo de símbolos que Yahoo Finance acepta en una misma petición
+BATCH_SIZE = 20
+
+
+def fetch_ticker_data_batch(tickers: list[str], period: str):
+    """
+    Obtiene los datos históricos de varios tickers con peticiones agrupadas.
+    
+    Args:
+        tickers (list[str]): Símbolos de las acciones (e.g., ["AAPL", "MSFT"]).
+        period (str): El periodo de tiempo para los datos históricos (e.g., "1y").
+    
+    Returns:
+        dict: Para cada ticker, una tupla (datos históricos, información general del ticker).
+    """
+    results = {}
+    for start in range(0, len(tickers), BATCH_SIZE):
+        chunk = tickers[start:start + BATCH_SIZE]
+        # yf.download no devuelve las mismas columnas que stock.history, así que usa su propia clave
+        keys = {ticker: f"{ticker}_{period}_download" for ticker in chunk}
+        cached = {ticker: _load_cached_df(keys[ticker]) for ticker in chunk}
         
-        return fundamental_data
+        # Descargar solo los tickers que no están en la caché
+        missing = [ticker for ticker in chunk if cached[ticker] is None]
+        history = None
+        if missing:
+            try:
+                # multi_level_index=True mantiene las columnas (ticker, dato) aunque solo falte un ticker
+                history = yf.download(
+                    " ".join(missing), period=period, group_by="ticker", threads=True, progress=False, multi_level_index=True
+                )
+            except Exception as e:
+                log.warning("Error al obtener datos para %s: %s", ", ".join(missing), e)
+
+        for ticker in chunk:
+            # Si falló la descarga del grupo ya se ha registrado el error
+            if cached[ticker] is None and history is None:
+                results[ticker] = (None, None)
+                continue
+            try:
+                data = cached[ticker]
+                if data is None:
+                    data = history[ticker].dropna(how="all")
+                    _save_cached_df(keys[ticker], data)
+                info = _get_info(ticker)
+                results[ticker] = (data, info)
+            except Exception as e:
+                log.warning("Error al obtener datos para %s: %s", ticker, e)
+                results[ticker] = (None, None)
+    return results
+
+
+def _build_fundamental_data(ticker_info):
+    """
+    Calcula las métricas fundamentales a partir de la información ya descargada.
+    
+    Args:
+        ticker_info (TickerInfo): Información general del ticker.
+    
+    Returns:
+        Fundamentals: Métricas clave para el análisis fundamental.
+    """
+    values = {}
+    for metric in _FUND_METRICS:
+        value = getattr(ticker_info, metric.metadata["key"])
+        formatter = metric.metadata["formatter"]
+        values[metric.name] = formatter(value) if formatter else (value if value is not None else "Dato no disponible")
+    
+    # Comparar deuda de años anteriores, si la información está disponible
+    total_debt = ticker_info.totalDebt
+    debt_to_equity = ticker_info.debtToEquity
+    debt_comparison = {
+        "Deuda Anterior": format_large_numbers(debt_to_equity),
+    }
+    
+    # Añadir crecimiento de la deuda si los datos son accesibles
+    if total_debt and debt_to_equity:
+        debt_comparison["Cambio Deuda"] = format_large_numbers(float(total_debt) / float(debt_to_equity))
+    
+    return Fundamentals(**values, debt_comparison=debt_comparison)
+
+
+def fetch_fundamental_data(ticker: str, info=None):
+    """
+    Obtiene los datos fundamentales para un ticker, incluyendo métricas clave de Peter Lynch.
+    
+    Args:
+        ticker (str): Símbolo de la acción (e.g., "AAPL").
+        info (TickerInfo, optional): Información del ticker ya obtenida; si no se indica, se consulta.
+    
+    Returns:
+        Fundamentals: Métricas clave para el análisis fundamental, o None si no se pudieron obtener.
+    """
+    if info is None:
+        try:
+            info = _get_info(ticker)
+        except Exception as e:
+            log.warning("Error al obtener datos fundamentales para %s: %s", ticker, e)
+            return None
+    # Un dato inesperado no debe interrumpir el análisis de los demás tickers
+    try:
+        return _build_fundamental_data(info)
     except Exception as e:
-        print(f"Error al obtener datos fundamentales para {ticker}: {e}")
+        log.warning("Error al calcular los datos fundamentales para %s: %s", ticker, e)
+        return None
+
+
+def _build_debt_comparison(balance_sheet):
+    """
+    Compara la deuda del año actual y el anterior a partir del balance ya descargado.
+    
+    Args:
+        balance_sheet (pd.DataFrame): Balance de la empresa, con los años más recientes primero.
+    
+    Returns:
+        dict: Comparación de deuda entre los dos años.
+    """
+    # Sin al menos dos años no hay nada que comparar
+    if balance_sheet is None or balance_sheet.shape[1] < 2:
         return {}
+    
+    # Localizar las filas de deuda una sola vez y trabajar sobre el array de numpy
+    total_debt_row, long_term_debt_row = balance_sheet.index.get_indexer(['Total Debt', 'Long Term Debt'])
+    bs_vals = balance_sheet.values
+    
+    # Columna 0: año actual, columna 1: año anterior
+    total_debt = bs_vals[total_debt_row, :2] if total_debt_row != -1 else None
+    debt_this_year, debt_last_year = total_debt if total_debt is not None else (None, None)
+    
+    # Si tenemos deuda a largo plazo, usaremos esos valores
+    long_term_debt = bs_vals[long_term_debt_row, :2] if long_term_debt_row != -1 else None
+    long_term_debt_this_year, long_term_debt_last_year = long_term_debt if long_term_debt is not None else (None, None)
+    
+    # Formatear de una vez los dos años de cada fila
+    total_debt_text = format_large_numbers_vec(pd.Series(total_debt)) if total_debt is not None else None
+    long_term_debt_text = format_large_numbers_vec(pd.Series(long_term_debt)) if long_term_debt is not None else None
+    
+    # Comparar las deudas
+    debt_comparison = {}
+    if debt_last_year is not None and debt_this_year is not None and not (pd.isna(debt_last_year) or pd.isna(debt_this_year)):
+        debt_comparison["Total Debt Last Year"] = total_debt_text.iloc[1]
+        debt_comparison["Total Debt This Year"] = total_debt_text.iloc[0]
+        debt_comparison["Debt Change"] = calculate_debt_change(debt_last_year, debt_this_year)
+    
+    if (
+        long_term_debt_last_year is not None
+        and long_term_debt_this_year is not None
+        and not (pd.isna(long_term_debt_last_year) or pd.isna(long_term_debt_this_year))
+    ):
+        debt_comparison["Long Term Debt Last Year"] = long_term_debt_text.iloc[1]
+        debt_comparison["Long Term Debt This Year"] = long_term_debt_text.iloc[0]
+        debt_comparison["Long Term Debt Change"] = calculate_debt_change(long_term_debt_last_year, long_term_debt_this_year)
+    
+    return debt_comparison
 
 
 def fetch_debt_comparison(ticker: str):
@@ -117,39 +457,22 @@ def fetch_debt_comparison(ticker: str):
         dict: Comparación de deuda entre los dos años.
     """
     try:
-        stock = yf.Ticker(ticker)
-        financials = stock.financials
-        balance_sheet = stock.balance_sheet
-        
-        # Obtener datos de deuda total
-        total_debt = balance_sheet.loc['Total Debt'] if 'Total Debt' in balance_sheet.index else None
-        long_term_debt = balance_sheet.loc['Long Term Debt'] if 'Long Term Debt' in balance_sheet.index else None
-        
-        # Asegúrate de usar iloc para obtener las posiciones
-        debt_last_year = total_debt.iloc[1] if total_debt is not None else None
-        debt_this_year = total_debt.iloc[0] if total_debt is not None else None
-        
-        # Si tenemos deuda a largo plazo, usaremos esos valores
-        long_term_debt_last_year = long_term_debt.iloc[1] if long_term_debt is not None else None
-        long_term_debt_this_year = long_term_debt.iloc[0] if long_term_debt is not None else None
-        
-        # Comparar las deudas
-        debt_comparison = {}
-        if debt_last_year and debt_this_year:
-            debt_comparison["Total Debt Last Year"] = format_large_numbers(debt_last_year)
-            debt_comparison["Total Debt This Year"] = format_large_numbers(debt_this_year)
-            debt_comparison["Debt Change"] = calculate_debt_change(debt_last_year, debt_this_year)
-        
-        if long_term_debt_last_year and long_term_debt_this_year:
-            debt_comparison["Long Term Debt Last Year"] = format_large_numbers(long_term_debt_last_year)
-            debt_comparison["Long Term Debt This Year"] = format_large_numbers(long_term_debt_this_year)
-            debt_comparison["Long Term Debt Change"] = calculate_debt_change(long_term_debt_last_year, long_term_debt_this_year)
-        
-        return debt_comparison
-
+        stock = get_ticker(ticker)
+        balance_sheet = _cached_df(f"{ticker}_balance_sheet", lambda: stock.balance_sheet)
     except Exception as e:
-        print(f"Error al obtener la comparación de deuda para {ticker}: {e}")
+        log.warning("Error al obtener la comparación de deuda para %s: %s", ticker, e)
         return {}
+    # Un balance inesperado no debe interrumpir el análisis de los demás tickers
+    try:
+        return _build_debt_comparison(balance_sheet)
+    except Exception as e:
+        log.warning("Error al calcular la comparación de deuda para %s: %s", ticker, e)
+        return {}
+
+
+@njit("f8(f8, f8)", cache=True)
+def _calc_delta(last_year_debt, this_year_debt):
+    return this_year_debt - last_year_debt
 
 
 def calculate_debt_change(last_year_debt, this_year_debt):
@@ -164,7 +487,7 @@ def calculate_debt_change(last_year_debt, this_year_debt):
         str: Indicador de si la deuda ha aumentado o disminuido, con el valor.
     """
     try:
-        debt_change = this_year_debt - last_year_debt
+        debt_change = _calc_delta(float(last_year_debt), float(this_year_debt))
         if debt_change > 0:
             return f"Aumento de {format_large_numbers(debt_change)}"
         elif debt_change < 0:
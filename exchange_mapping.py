@@ -1,6 +1,9 @@
 ## Dictionary to map the codes of the markets or exchanges to readable name
+## Read-only so it can be shared safely between threads and callers
 
-EXCHANGE_MAPPING = {
+from types import MappingProxyType
+
+EXCHANGE_MAPPING = MappingProxyType({
     "NMS": "NASDAQ",
     "NYQ": "NYSE",
     "ASE": "AMEX",
@@ -9,4 +12,4 @@ EXCHANGE_MAPPING = {
     "LSE": "London Stock Exchange",
     "JPX": "Tokyo Stock Exchange",
     "OTC": "Over the Counter"
-}
\ No newline at end of file
+})
\ No newline at end of file
@@ -1,48 +1,91 @@
-from data_fetcher import fetch_ticker_data, fetch_fundamental_data, fetch_debt_comparison
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from data_fetcher import fetch_ticker_data, fetch_ticker_data_batch, fetch_fundamental_data, fetch_debt_comparison
 from exchange_mapping import EXCHANGE_MAPPING
 
-def main():
-    print("=== Análisis de Tickers ===")
-    ticker = input("Introduce el ticker de la empresa (e.g., AAPL): ").strip().upper()
-    period = input("Introduce el periodo de análisis (por defecto: 1y): ").strip() or "1y"
+_NO_DATA_MESSAGE = "No se pudieron obtener datos para el ticker especificado. Verifica el símbolo e intenta de nuevo."
+
+def analyze_ticker(ticker, period, ticker_data=None, _xm=EXCHANGE_MAPPING):
+    """
+    Obtiene y muestra el análisis completo de un ticker.
     
+    Args:
+        ticker (str): Símbolo de la acción (e.g., "AAPL").
+        period (str): El periodo de tiempo para los datos históricos (e.g., "1y").
+        ticker_data (tuple, optional): (datos históricos, información) ya obtenidos en lote.
+    """
     print(f"Obteniendo datos para {ticker}...")
-    data, info = fetch_ticker_data(ticker, period)
+    # Si el lote ya falló para este ticker no merece la pena consultar el resto
+    if ticker_data is not None and (ticker_data[0] is None or ticker_data[1] is None):
+        print(_NO_DATA_MESSAGE)
+        return
+    
+    # Las consultas son independientes, así que se lanzan en paralelo
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        if ticker_data is None:
+            ticker_future = executor.submit(fetch_ticker_data, ticker, period)
+        # En modo lote la información ya está descargada y se reutiliza
+        batch_info = ticker_data[1] if ticker_data is not None else None
+        fundamental_future = executor.submit(fetch_fundamental_data, ticker, batch_info)
+        debt_future = executor.submit(fetch_debt_comparison, ticker)
+        data, info = ticker_data if ticker_data is not None else ticker_future.result()
+        fundamental_data = fundamental_future.result()
+        debt_comparison = debt_future.result()
     
     if data is not None and info is not None:
         # Obtener el nombre del mercado
-        market_code = info.get('exchange', 'N/D')
-        market_name = EXCHANGE_MAPPING.get(market_code, market_code)
+        market_code = info.exchange or 'N/D'
+        market_name = _xm.get(market_code, market_code)
         
         # Mostrar información básica del ticker
-        print(f"\n=== Información del Ticker ===")
-        print(f"Símbolo: ${info.get('symbol', 'N/D')}")
-        print(f"Nombre: {info.get('longName', 'N/D')}")
-        print(f"Mercado: {market_name}")
-        print(f"Sector: {info.get('sector', 'N/D')}")
-        print(f"Industria: {info.get('industry', 'N/D')}")
-        print(f"País: {info.get('country', 'N/D')}")
-        print(f"Divisa: {info.get('currency', 'N/D')}")
+        lines = [
+            "\n=== Información del Ticker ===",
+            f"Símbolo: ${info.symbol or 'N/D'}",
+            f"Nombre: {info.longName or 'N/D'}",
+            f"Mercado: {market_name}",
+            f"Sector: {info.sector or 'N/D'}",
+            f"Industria: {info.industry or 'N/D'}",
+            f"País: {info.country or 'N/D'}",
+            f"Divisa: {info.currency or 'N/D'}",
+        ]
 
         # Mostrar últimas filas de datos históricos
-        print("\n=== Últimos Datos Históricos ===")
-        print(data.tail())  # Mostrar las últimas 5 filas como prueba.
-
-        # Obtener y mostrar datos fundamentales
-        print("\n=== Análisis Fundamental ===")
-        fundamental_data = fetch_fundamental_data(ticker)
-        for key, value in fundamental_data.items():
-            print(f"{key}: {value}")
-
-        # Obtener y mostrar la comparación de deuda
-        print("\n=== Comparación de Deuda ===")
-        debt_comparison = fetch_debt_comparison(ticker)
+        lines.append("\n=== Últimos Datos Históricos ===")
+        lines.append(str(data.tail()))  # Mostrar las últimas 5 filas como prueba.
+
+        # Mostrar datos fundamentales
+        lines.append("\n=== Análisis Fundamental ===")
+        if fundamental_data is not None:
+            lines.extend(f"{key}: {value}" for key, value in fundamental_data.items())
+
+        # Mostrar la comparación de deuda
+        lines.append("\n=== Comparación de Deuda ===")
         if debt_comparison:
-            for key, value in debt_comparison.items():
-                print(f"{key}: {value}")
+            lines.extend(f"{key}: {value}" for key, value in debt_comparison.items())
 
+        # Escribir todo el informe del ticker de una sola vez
+        sys.stdout.write("\n".join(lines) + "\n")
+
+    else:
+        print(_NO_DATA_MESSAGE)
+
+def main():
+    print("=== Análisis de Tickers ===")
+    tickers_input = input("Introduce el ticker de la empresa o varios separados por comas (e.g., AAPL, MSFT): ")
+    tickers = [ticker.strip().upper() for ticker in tickers_input.split(",") if ticker.strip()]
+    period = input("Introduce el periodo de análisis (por defecto: 1y): ").strip() or "1y"
+    
+    if len(tickers) > 1:
+        # Descargar los históricos de todos los tickers en peticiones agrupadas
+        batch_data = fetch_ticker_data_batch(tickers, period)
+        for ticker in tickers:
+            analyze_ticker(ticker, period, batch_data[ticker])
+            print()
     else:
-        print("No se pudieron obtener datos para el ticker especificado. Verifica el símbolo e intenta de nuevo.")
+        analyze_ticker(tickers[0] if tickers else "", period)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
     main()